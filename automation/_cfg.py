@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# _cfg.py — YAML config loading shared by the capture scripts
+#
+# Parsed configs are cached in-process and, as JSON, on disk across runs; both caches are keyed
+# by the file's mtime and size. Needs only PyYAML, so scripts can read their config without
+# loading the PicoSDK driver.
+
+import copy
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Tuple
+
+import yaml
+
+# libyaml-backed loader when available; same safe semantics as yaml.safe_load
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader  # type: ignore[assignment]
+
+# Parsed configs keyed by absolute path -> (mtime_ns, size, cfg); oldest evicted first
+_CFG_CACHE: "OrderedDict[str, Tuple[int, int, dict]]" = OrderedDict()
+_CFG_CACHE_MAX = 100
+
+# Parsed configs are also kept across runs as JSON (one file per config path), so scripted
+# loops that start this tool many times skip the YAML parse while the file is unchanged
+_CFG_DISK_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "picoshot")
+
+
+def _load_cfg_cached(path: str, mtime_ns: int, size: int) -> Any:
+    """Parse ``path``, going through the on-disk JSON cache keyed by (path, mtime_ns, size)."""
+    cache = os.path.join(_CFG_DISK_CACHE, hashlib.blake2b(path.encode("utf-8"), digest_size=16).hexdigest() + ".json")
+    try:
+        with open(cache, "r") as f:
+            entry = json.load(f)
+        if entry["path"] == path and entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+            return entry["cfg"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # missing, stale or unreadable cache → parse the YAML
+
+    with open(path, "r") as f:
+        cfg = yaml.load(f, Loader=_Loader)
+
+    # Only cache configs that survive a JSON round trip unchanged (e.g. no non-string keys)
+    try:
+        text = json.dumps({"path": path, "mtime_ns": mtime_ns, "size": size, "cfg": cfg})
+        if json.loads(text)["cfg"] == cfg:
+            os.makedirs(_CFG_DISK_CACHE, exist_ok=True)
+            tmp = f"{cache}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(text)
+            os.replace(tmp, cache)
+    except (OSError, TypeError, ValueError):
+        pass  # caching is best effort
+    return cfg
+
+
+def load_cfg(path: str) -> dict:
+    """Load a YAML config, reusing the parsed result while the file is unchanged.
+
+    Returns a deep copy so callers may apply overrides without touching the cache.
+    """
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    hit = _CFG_CACHE.get(key)
+    if hit is None or hit[0] != st.st_mtime_ns or hit[1] != st.st_size:
+        hit = (st.st_mtime_ns, st.st_size, _load_cfg_cached(key, st.st_mtime_ns, st.st_size))
+        _CFG_CACHE[key] = hit
+        while len(_CFG_CACHE) > _CFG_CACHE_MAX:
+            _CFG_CACHE.popitem(last=False)
+    _CFG_CACHE.move_to_end(key)
+    return copy.deepcopy(hit[2])
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# _csv_fast.py — optional Numba kernel that renders capture rows straight to ASCII
+#
+# The kernel reads raw int16 ADC codes and writes "time_ns,mV\n" rows in the same fixed-point
+# layout as the pure-Python fallback ("%.3f,%.4f\n") into a preallocated uint8 buffer. The mV
+# scale and the time axis are computed inline, so the samples are read once and no per-row
+# Python objects (or intermediate float arrays) are created. Rows are rendered in independent
+# blocks across cores and then packed into one contiguous run. Numba is optional: callers
+# check NUMBA_AVAILABLE and fall back to %-formatting.
+
+import numpy as np
+
+try:
+    import numba
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except Exception:  # numba not installed (or broken) → pure-Python path
+    numba = None  # type: ignore[assignment]
+    njit = None  # type: ignore[assignment]
+    prange = range
+    NUMBA_AVAILABLE = False
+
+# Upper bound on one rendered row: sign + 19 digits + "." + 3 decimals, ",",
+# sign + 19 digits + "." + 4 decimals, "\n"
+MAX_ROW_BYTES = 52
+
+# Rows per parallel block; each block renders into its own MAX_ROW_BYTES-sized slot of ``out``
+BLOCK_ROWS = 16384
+
+_DIGITS = np.frombuffer(b"0123456789", dtype=np.uint8)
+
+
+def _put_fixed(out, pos, x, scale, decimals, digits):
+    """Write ``x`` with ``decimals`` fractional digits at ``out[pos:]``; return the new end."""
+    v = np.int64(np.rint(x * scale))  # half-to-even, like printf on exact ties
+    if v < 0:
+        out[pos] = 45  # "-"
+        pos += 1
+        v = -v
+    ip = v // scale
+    fp = v - ip * scale
+    n = 1
+    q = ip
+    while q >= 10:
+        q //= 10
+        n += 1
+    q = ip
+    for k in range(n):
+        out[pos + n - 1 - k] = digits[q % 10]
+        q //= 10
+    pos += n
+    out[pos] = 46  # "."
+    pos += 1
+    q = fp
+    for k in range(decimals):
+        out[pos + decimals - 1 - k] = digits[q % 10]
+        q //= 10
+    return pos + decimals
+
+
+def _encode_rows(adc, first, pre, dt_ns, range_mv, max_adc, out, lengths, digits):
+    """Render one row per ADC code into per-block slots of ``out``; fill ``lengths`` per block."""
+    n = adc.shape[0]
+    nblocks = lengths.shape[0]
+    for b in prange(nblocks):
+        lo = b * BLOCK_ROWS
+        hi = min(lo + BLOCK_ROWS, n)
+        pos = lo * MAX_ROW_BYTES
+        start = pos
+        for i in range(lo, hi):
+            # same arithmetic as (arange - pre) * dt_ns and adc * range_mV / max_adc in NumPy
+            pos = _put_fixed(out, pos, (first + i - pre) * dt_ns, 1000, 3, digits)
+            out[pos] = 44  # ","
+            pos += 1
+            pos = _put_fixed(out, pos, np.int64(adc[i]) * range_mv / max_adc, 10000, 4, digits)
+            out[pos] = 10  # "\n"
+            pos += 1
+        lengths[b] = pos - start
+
+
+if NUMBA_AVAILABLE:
+    _put_fixed = njit(cache=True, nogil=True)(_put_fixed)
+    _encode_rows = njit(cache=True, nogil=True, parallel=True)(_encode_rows)
+
+
+def limit_threads(n: int) -> None:
+    """Run the parallel kernel on at most ``n`` threads in this process (no-op without Numba)."""
+    if NUMBA_AVAILABLE:
+        numba.set_num_threads(max(1, min(n, numba.config.NUMBA_NUM_THREADS)))
+
+
+def encode_rows(
+    adc: np.ndarray, first: int, pre: int, dt_ns: float, range_mv: int, max_adc: int, out: np.ndarray
+) -> np.ndarray:
+    """Render CSV rows for samples ``first .. first + len(adc)`` of a capture.
+
+    ``out`` is uint8 with room for at least ``len(adc) * MAX_ROW_BYTES``. Block ``b`` is written
+    at ``out[b * BLOCK_ROWS * MAX_ROW_BYTES:]``; the returned array holds its byte count.
+    """
+    lengths = np.empty((len(adc) + BLOCK_ROWS - 1) // BLOCK_ROWS, dtype=np.int64)
+    _encode_rows(adc, first, pre, float(dt_ns), range_mv, max_adc, out, lengths, _DIGITS)
+    return lengths
+
+
+def pack_blocks(out: np.ndarray, lengths: np.ndarray) -> int:
+    """Move the block slots written by :func:`encode_rows` together; return the total bytes.
+
+    Block ``b`` lands at the running sum of ``lengths[:b]``, so ``out[:total]`` is one run of
+    rows ready for a single ``write``. Targets never pass their source, and NumPy copies
+    overlapping slices correctly, so the packing is done in place.
+    """
+    slot = BLOCK_ROWS * MAX_ROW_BYTES
+    pos = 0
+    for b, n in enumerate(lengths.tolist()):
+        src = b * slot
+        if src != pos:
+            out[pos:pos + n] = out[src:src + n]
+        pos += n
+    return pos
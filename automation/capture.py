@@ -0,0 +1,539 @@
+# -*- coding: utf-8 -*-
+# capture.py — PS5000A block capture engine shared by the capture scripts
+#
+# Opens and configures the unit from a config dict (channel, trigger, timebase, buffer),
+# runs block captures and writes them as CSV and/or NumPy files. The command-line scripts
+# (capture_single_shot.py, capture_multi_shot.py) only parse arguments and call into here;
+# file naming lives in naming.py and config loading in _cfg.py.
+
+import ctypes
+import threading
+import os
+import json
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional
+
+import numpy as np
+from picosdk.ps5000a import ps5000a as ps
+from picosdk.functions import assert_pico_ok
+from picosdk.constants import PICO_STATUS
+
+import _csv_fast
+import naming
+
+# ---- Optional Parquet output (csv_path ending in ".parquet") ----
+try:
+    import pyarrow as _pa  # type: ignore
+    import pyarrow.parquet as _pq  # type: ignore
+    _PYARROW_AVAILABLE = True
+except Exception:
+    _pa = None  # type: ignore[assignment]
+    _pq = None  # type: ignore[assignment]
+    _PYARROW_AVAILABLE = False
+
+# Full-scale mV per PS5000A_RANGE enum value (same table as picosdk.functions.adc2mV)
+_RANGE_MV = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+
+# Plain-dict copies of the driver enum tables, taken once at import
+_CHANNEL = dict(ps.PS5000A_CHANNEL)
+_COUPLING = dict(ps.PS5000A_COUPLING)
+_RANGE = dict(ps.PS5000A_RANGE)
+_RESOLUTION = dict(ps.PS5000A_DEVICE_RESOLUTION)
+_DIR = dict(ps.PS5000A_THRESHOLD_DIRECTION)
+_RATIO_NONE = ps.PS5000A_RATIO_MODE["PS5000A_RATIO_MODE_NONE"]
+_RISING = _DIR["PS5000A_RISING"]
+# Channels switched off during setup to maximize sample rate (those this binding defines)
+_OTHER_CHANNELS = tuple(
+    _CHANNEL[k] for k in ("PS5000A_CHANNEL_B", "PS5000A_CHANNEL_C", "PS5000A_CHANNEL_D") if k in _CHANNEL
+)
+
+# Status codes tested on the setup path (picosdk.constants.PICO_STATUS, the table ps.PICO_STATUS
+# also points at), resolved once at import
+_PICO_OK = PICO_STATUS["PICO_OK"]
+_INVALID_CHANNEL = PICO_STATUS.get("PICO_INVALID_CHANNEL")
+_INVALID_TIMEBASE = PICO_STATUS.get("PICO_INVALID_TIMEBASE")
+_POWER_SOURCE_STATUS = (
+    PICO_STATUS.get("PICO_POWER_SUPPLY_NOT_CONNECTED", 282),
+    PICO_STATUS.get("PICO_USB3_0_DEVICE_NON_USB3_0_PORT", 286),
+)
+
+# CSV row layout: time in ns, amplitude in mV
+_CSV_ROW = "%.3f,%.4f\n"
+
+# User-space buffer for output files; large captures flush only on close
+_WRITE_BUFFER = 16 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_enums(
+    resolution: str,
+    channel: str,
+    coupling: str,
+    vrange: str,
+    trig_source: Optional[str],
+    trig_direction: Optional[str],
+) -> Tuple[int, int, int, int, Optional[int], Optional[int]]:
+    """Map config enum names to driver integers once per distinct combination."""
+    return (
+        _RESOLUTION[resolution],
+        _CHANNEL[channel],
+        _COUPLING[coupling],
+        _RANGE[vrange],
+        _CHANNEL[trig_source] if trig_source is not None else None,
+        _DIR[trig_direction] if trig_direction is not None else None,
+    )
+
+
+def pico_ok(code: int) -> bool:
+    return code == _PICO_OK
+
+
+class CaptureContext:
+    """Open unit handle, resolved settings and reusable buffers for a capture session."""
+
+    def __init__(self, cfg: dict):
+        self.cfg = cfg
+        self.handle = ctypes.c_int16()
+        self.chan = 0
+        self.vrng = 0
+        self.max_adc = ctypes.c_int16()
+        self.total = 0
+        self.pre = 0
+        self.post = 0
+        self.timebase = 0
+        self.dt_ns = 0.0
+        self.buf_max: Optional[np.ndarray] = None
+        self.csv_scratch: Optional[np.ndarray] = None  # ASCII rows for one write chunk
+        self.name_stem = "capture"
+        # RunBlock completion: the driver calls ready_cb from its own thread. The ctypes
+        # callback object lives on the context so it is not collected while a block is armed.
+        self.ready_evt = threading.Event()
+        self.ready_status = 0
+        self.ready_cb = ps.BlockReadyType(self._on_block_ready)
+
+        # Output and naming options are fixed for the session; read them from cfg once here
+        # rather than on every shot.
+        save_fmt = str(cfg.get("save_format", "csv")).strip().lower()
+        self.do_csv = save_fmt in ("csv", "both")
+        self.do_np = save_fmt in ("numpy", "both")
+        self.write_chunk = int(cfg.get("write_chunk", 200000))
+        self.csv_path = cfg.get("csv_path", "capture.csv")
+        # csv_path ending in .npy/.parquet selects a binary (time_ns, mV) table instead of text
+        ext = os.path.splitext(self.csv_path)[1].lower()
+        self.csv_ext = ext if ext in (".npy", ".parquet") else ".csv"
+        if self.do_csv and self.csv_ext == ".parquet" and not _PYARROW_AVAILABLE:
+            raise RuntimeError(f"csv_path {self.csv_path!r} needs pyarrow, which is not installed")
+        # numpy_path names the stem; only a legacy ".npz"/".npy" extension is dropped, so dotted
+        # stems such as "run_1.5V" are kept whole
+        np_path = str(cfg.get("numpy_path", "capture.npz"))
+        np_root, np_ext = os.path.splitext(np_path)
+        self.np_base = np_root if np_ext.lower() in (".npz", ".npy") else np_path
+        self.vrange_name = cfg["vrange"]
+        self.resolution_name = cfg.get("resolution", "PS5000A_DR_8BIT")
+        self.ts_enabled = bool(cfg.get("timestamp_filenames", False))
+        # Defaults that keep behavior if cfg keys absent
+        self.daq_source = str(cfg.get("daq_source", "auto")).lower()      # auto | ai | ao | none
+        self.name_embed = str(cfg.get("name_embed", "mini")).lower()      # none | mini | full
+        self.name_max = int(cfg.get("name_maxlen", 120))
+
+    def _on_block_ready(self, handle: int, status: int, param: Optional[int]) -> None:
+        self.ready_status = status
+        self.ready_evt.set()
+
+
+def _name_stem(ctx: CaptureContext) -> str:
+    """Build the per-shot file stem from the timestamp and optional DAQ snapshot."""
+    if not ctx.ts_enabled:
+        return "capture"
+    return naming.name_stem(ctx.daq_source, ctx.name_embed, ctx.name_max)
+
+
+def setup(cfg: dict, buffer: Optional[np.ndarray] = None) -> CaptureContext:
+    """Open the unit, configure channel/trigger/timebase and allocate sample buffers.
+
+    ``buffer`` (int16, C-contiguous) is registered with the driver instead of a new array when
+    it has exactly the number of samples this capture needs.
+    """
+    print(f"Loaded config: channel={cfg['channel']} timebase={cfg['timebase']} samples={cfg['samples']}")
+    ctx = CaptureContext(cfg)
+
+    trig_on = bool(cfg.get("trig_enabled", False))
+    res, chan, coup, vrng, src, tdir = _resolve_enums(
+        cfg.get("resolution", "PS5000A_DR_8BIT"),
+        cfg["channel"],
+        cfg["coupling"],
+        cfg["vrange"],
+        cfg["trig_source"] if trig_on else None,
+        cfg["trig_direction"] if trig_on else None,
+    )
+    ctx.chan = chan
+    ctx.vrng = vrng
+
+    # ---- Open unit at requested resolution ----
+    h = ctx.handle
+    st = ps.ps5000aOpenUnit(ctypes.byref(h), None, res)
+
+    # Handle common power-source prompts (same pattern as Pico examples)
+    try:
+        assert_pico_ok(st)
+    except Exception:
+        if st in _POWER_SOURCE_STATUS:
+            assert_pico_ok(ps.ps5000aChangePowerSource(h, st))
+        else:
+            raise
+
+    print(f"Opened PS5000A handle: {h.value}")
+
+    try:
+        _configure(ctx, coup, trig_on, src, tdir, buffer)
+    except Exception:
+        ps.ps5000aCloseUnit(h)
+        raise
+    return ctx
+
+
+def _configure(
+    ctx: CaptureContext, coup: int, trig_on: bool, src: Optional[int], tdir: Optional[int],
+    buffer: Optional[np.ndarray] = None,
+) -> None:
+    """Channel, trigger, timebase and buffer setup on an already-open unit."""
+    cfg, h, chan, vrng = ctx.cfg, ctx.handle, ctx.chan, ctx.vrng
+
+    # ---- Channel A configuration ----
+    assert_pico_ok(ps.ps5000aSetChannel(h, chan, 1, coup, vrng, ctypes.c_float(cfg["offset_v"])))
+    print("Channel A set.")
+
+    # Try to disable other channels to maximize sample rate (ignore INVALID_CHANNEL)
+    off_v = ctypes.c_float(0.0)
+    for ch in _OTHER_CHANNELS:
+        st = ps.ps5000aSetChannel(h, ch, 0, coup, vrng, off_v)
+        if (_INVALID_CHANNEL is not None) and (st == _INVALID_CHANNEL):
+            pass  # not present on your variant → ignore
+        else:
+            assert_pico_ok(st)
+
+    # ---- Max ADC (for conversions) ----
+    assert_pico_ok(ps.ps5000aMaximumValue(h, ctypes.byref(ctx.max_adc)))
+
+    # ---- Trigger config ----
+    if trig_on:
+        # same rounding as picosdk.functions.mV2adc, using the range table already in hand
+        thr  = int(round(cfg["trig_level_mV"] * ctx.max_adc.value / _RANGE_MV[vrng]))
+        assert_pico_ok(ps.ps5000aSetSimpleTrigger(
+            h, 1, src, thr, tdir, int(cfg["trig_delay_samples"]), int(cfg["auto_trig_ms"])
+        ))
+        print("Trigger enabled.")
+    else:
+        assert_pico_ok(ps.ps5000aSetSimpleTrigger(
+            h, 0, chan, 0, _RISING, 0, 0
+        ))
+        print("Trigger disabled (immediate).")
+
+    # ---- Sample counts ----
+    total = int(cfg["samples"])
+    pre   = int(total * float(cfg["pre_ratio"]))
+    post  = total - pre
+
+    # ---- Get valid timebase (6-arg ps5000aGetTimebase2) ----
+    tb_req = int(cfg["timebase"])
+    tb     = tb_req
+    dt_ns  = ctypes.c_float()
+    retmax = ctypes.c_int32()
+
+    while True:
+        st = ps.ps5000aGetTimebase2(h, tb, total, ctypes.byref(dt_ns), ctypes.byref(retmax), 0)
+        if pico_ok(st):
+            break
+        if st == _INVALID_TIMEBASE:
+            tb += 1
+            continue
+        assert_pico_ok(st)
+
+    if tb != tb_req:
+        print(f"Requested timebase={tb_req} not valid for {total} samples; using timebase={tb}")
+    print(f"Timebase OK: dt ~ {dt_ns.value:.3f} ns, driver maxSamples={retmax.value}")
+
+    ctx.total, ctx.pre, ctx.post = total, pre, post
+    ctx.timebase = tb
+    ctx.dt_ns = float(dt_ns.value)
+
+    # ---- Buffer (raw mode needs no min/max pair, so the single-buffer call is enough) ----
+    # Allocated and registered once per session; the driver overwrites every sample it returns,
+    # so np.empty skips a pointless zero-fill. A caller-supplied buffer of the right shape is
+    # reused as-is, so repeated run_capture() calls do not fault in fresh pages every shot.
+    if (buffer is not None and buffer.dtype == np.int16 and buffer.shape == (total,)
+            and buffer.flags.c_contiguous and buffer.flags.writeable):
+        ctx.buf_max = buffer
+    else:
+        ctx.buf_max = np.empty(total, dtype=np.int16)
+    assert_pico_ok(ps.ps5000aSetDataBuffer(
+        h, chan,
+        ctx.buf_max.ctypes.data_as(ctypes.POINTER(ctypes.c_int16)),
+        total, 0, _RATIO_NONE,
+    ))
+
+
+def _time_axis(start: int, stop: int, pre: int, dt_ns: float) -> np.ndarray:
+    """Times in ns, relative to the trigger point, of samples ``start .. stop - 1``."""
+    return (np.arange(start, stop, dtype=np.int64) - pre) * dt_ns
+
+
+def acquire(ctx: CaptureContext, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Run one block capture and return the retrieved raw ADC codes (int16).
+
+    Sample ``i`` is at ``(i - ctx.pre) * ctx.dt_ns`` ns; mV = adc * range_mV / max_adc.
+    The codes are copied into ``out`` (int16, ``ctx.total`` long) when given, else into a new
+    array. ``out=ctx.buf_max`` returns a view of the driver buffer without copying; that view
+    is only valid until the next acquire.
+    """
+    h = ctx.handle
+    ctx.name_stem = _name_stem(ctx)
+
+    # ---- Run block ----
+    ready_evt = ctx.ready_evt
+    ready_evt.clear()
+    assert_pico_ok(ps.ps5000aRunBlock(h, ctx.pre, ctx.post, ctx.timebase, None, 0, ctx.ready_cb, None))
+    print("Acquiring...")
+    # Woken by the driver's block-ready callback; the bounded waits only keep Ctrl+C responsive
+    while not ready_evt.wait(0.1):
+        pass
+    if ctx.ready_status != _PICO_OK:
+        assert_pico_ok(ctx.ready_status)  # raises with the decoded status name
+
+    c_samples = ctypes.c_int32(ctx.total)
+    overflow  = ctypes.c_int16()
+    assert_pico_ok(ps.ps5000aGetValues(h, 0, ctypes.byref(c_samples), 0, 0, 0, ctypes.byref(overflow)))
+    ns = c_samples.value
+    print(f"Retrieved {ns} samples; overflow={overflow.value}")
+
+    # copy out of the session buffer: the next RunBlock reuses it while this shot is saved
+    if out is None:
+        return ctx.buf_max[:ns].copy()
+    if out is not ctx.buf_max:
+        np.copyto(out[:ns], ctx.buf_max[:ns])
+    return out[:ns]
+
+
+def _save_npy(path: str, arr: np.ndarray) -> None:
+    """Write a single array as an uncompressed .npy file."""
+    with open(path, "wb", buffering=_WRITE_BUFFER) as f:
+        np.save(f, arr, allow_pickle=False)
+
+
+def _write_csv(ctx: CaptureContext, adc: np.ndarray, path: str) -> None:
+    """Write ``time_ns,mV`` text rows for one capture."""
+    ns = len(adc)
+    range_mv, max_adc = _RANGE_MV[ctx.vrng], ctx.max_adc.value
+    chunk = ctx.write_chunk
+    # Rows are rendered to ASCII per chunk: by the Numba kernel when available (mV scale,
+    # time axis and digits fused into one parallel pass over the int16 codes), otherwise by
+    # one C-level %-format per chunk (never a csv.writer call per row).
+    if _csv_fast.NUMBA_AVAILABLE:
+        # sized for a full chunk once and reused by every later shot of the session
+        need = min(chunk, ns) * _csv_fast.MAX_ROW_BYTES
+        if ctx.csv_scratch is None or len(ctx.csv_scratch) < need:
+            ctx.csv_scratch = np.empty(need, dtype=np.uint8)
+        scratch = ctx.csv_scratch
+        view = memoryview(scratch)
+    with open(path, "wb", buffering=_WRITE_BUFFER) as f:
+        f.write(b"time_ns,mV\n")
+        for i in range(0, ns, chunk):
+            j = min(i + chunk, ns)
+            if _csv_fast.NUMBA_AVAILABLE:
+                lengths = _csv_fast.encode_rows(
+                    adc[i:j], i, ctx.pre, ctx.dt_ns, range_mv, max_adc, scratch
+                )
+                # one contiguous write per chunk instead of one per block slot
+                f.write(view[:_csv_fast.pack_blocks(scratch, lengths)])
+            else:
+                # scale one chunk at a time; a full-length float64 mV array is never held
+                mv = adc[i:j].astype(np.int32) * range_mv / max_adc
+                time_ns = _time_axis(i, j, ctx.pre, ctx.dt_ns)
+                rows = np.column_stack((time_ns, mv)).ravel().tolist()
+                f.write(((_CSV_ROW * (j - i)) % tuple(rows)).encode("ascii"))
+
+
+def _write_table(ctx: CaptureContext, adc: np.ndarray, path: str) -> None:
+    """Write the (time_ns, mV) columns of one capture as .npy (N x 2 float64) or Parquet."""
+    ns = len(adc)
+    range_mv, max_adc = _RANGE_MV[ctx.vrng], ctx.max_adc.value
+    if ctx.csv_ext == ".npy":
+        # fill the N x 2 result in place (same values as _time_axis and the CSV scaling) rather
+        # than building full-length time/mV temporaries and stacking them
+        cols = np.empty((ns, 2))
+        t, mv = cols[:, 0], cols[:, 1]
+        t[:] = np.arange(-ctx.pre, ns - ctx.pre, dtype=np.int64)
+        t *= ctx.dt_ns
+        mv[:] = adc
+        mv *= range_mv
+        mv /= max_adc
+        _save_npy(path, cols)
+    else:
+        time_ns = _time_axis(0, ns, ctx.pre, ctx.dt_ns)
+        mv = adc.astype(np.int32) * range_mv / max_adc
+        table = _pa.table({"time_ns": time_ns, "mV": mv})
+        _pq.write_table(table, path, compression="zstd", row_group_size=1 << 20)
+
+
+def save(ctx: CaptureContext, adc: np.ndarray, name_stem: Optional[str] = None) -> None:
+    """Write one capture to CSV and/or NumPy as selected by ``save_format``.
+
+    ``name_stem`` defaults to the stem of the most recent :func:`acquire`; pass it explicitly
+    when saving from another thread while the next shot is already running.
+    """
+    ns = len(adc)
+    if name_stem is None:
+        name_stem = ctx.name_stem
+
+    if ctx.do_csv:
+        csv_path = ctx.csv_path
+        if ctx.ts_enabled:
+            csv_dir = os.path.dirname(csv_path) or "."
+            csv_path = os.path.join(csv_dir, f"{name_stem}{ctx.csv_ext}")
+        if ctx.csv_ext == ".csv":
+            _write_csv(ctx, adc, csv_path)
+        else:
+            _write_table(ctx, adc, csv_path)
+        print(f"CSV: wrote {ns} rows to {csv_path}")
+
+    if ctx.do_np:
+        np_base = ctx.np_base
+        if ctx.ts_enabled:
+            np_dir = os.path.dirname(np_base) or "."
+            np_base = os.path.join(np_dir, name_stem)
+        # plain .npy files are a header plus the raw array bytes: no zip container or CRC pass.
+        # The time axis is not stored: it is (arange(total_samples) - pre_samples) * dt_ns.
+        # raw ADC codes are exact and need no conversion pass; readers scale lazily with
+        # mV = adc * adc_to_mV (or exactly, adc * range_mV / max_adc) from the metadata
+        codes, max_adc = adc, int(ctx.max_adc.value)
+        if ctx.resolution_name == "PS5000A_DR_8BIT" and not (adc & 0xFF).any():
+            # 8-bit samples come back scaled into the high byte (max_adc 32512 = 127 << 8), so
+            # the low byte is zero and the codes fit int8 exactly at half the file size
+            codes, max_adc = (adc >> 8).astype(np.int8), max_adc >> 8
+        _save_npy(f"{np_base}.adc.npy", codes)
+        with open(f"{np_base}.json", "w") as f:
+            json.dump({
+                "dt_ns": ctx.dt_ns,
+                "pre_samples": ctx.pre,
+                "total_samples": ns,
+                "vrange": ctx.vrange_name,
+                "range_mV": _RANGE_MV[ctx.vrng],
+                "max_adc": max_adc,
+                "adc_to_mV": _RANGE_MV[ctx.vrng] / max_adc,
+                "resolution": ctx.resolution_name,
+            }, f, indent=2)
+        print(f"NumPy: wrote {np_base}.adc.npy (+ {np_base}.json)")
+
+
+def teardown(ctx: CaptureContext) -> None:
+    """Stop acquisition and close the unit."""
+    assert_pico_ok(ps.ps5000aStop(ctx.handle))
+    assert_pico_ok(ps.ps5000aCloseUnit(ctx.handle))
+
+
+# Output-only context rebuilt in each writer process by init_writer()
+_WORKER_CTX: Optional[CaptureContext] = None
+
+
+def init_writer(
+    cfg: dict, total: int, pre: int, dt_ns: float, vrng: int, max_adc: int, workers: int = 1
+) -> None:
+    """ProcessPoolExecutor initializer: rebuild what :func:`save` needs inside a worker.
+
+    ``workers`` is the pool size; each worker's CSV kernel gets an equal share of the cores so
+    the pool together does not oversubscribe the CPU.
+    """
+    global _WORKER_CTX
+    _csv_fast.limit_threads((os.cpu_count() or 1) // max(1, workers))
+    ctx = CaptureContext(cfg)
+    ctx.total, ctx.pre, ctx.dt_ns = total, pre, dt_ns
+    ctx.vrng = vrng
+    ctx.max_adc.value = max_adc
+    _WORKER_CTX = ctx
+
+
+def save_in_worker(adc: np.ndarray, name_stem: str) -> None:
+    """Write one capture from a process initialised by :func:`init_writer`."""
+    save(_WORKER_CTX, adc, name_stem=name_stem)
+
+
+class PicoSession:
+    """Keep one PS5000A unit open and configured across any number of captures.
+
+    ``with PicoSession(cfg) as sess: sess.capture()`` opens and configures the unit on entry
+    and stops/closes it on exit, so repeated shots skip the USB open/close handshake.
+    """
+
+    def __init__(self, cfg: dict):
+        self.cfg = cfg
+        self.ctx: Optional[CaptureContext] = None
+
+    def __enter__(self) -> "PicoSession":
+        self.ctx = setup(self.cfg)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.ctx is not None:
+            ctx, self.ctx = self.ctx, None
+            teardown(ctx)
+
+    @property
+    def name_stem(self) -> str:
+        """File stem of the most recent capture."""
+        return self.ctx.name_stem
+
+    def writer_args(self, workers: int = 1) -> Tuple[dict, int, int, float, int, int, int]:
+        """``initargs`` for :func:`init_writer` matching this session and a pool of ``workers``."""
+        ctx = self.ctx
+        return self.cfg, ctx.total, ctx.pre, ctx.dt_ns, ctx.vrng, int(ctx.max_adc.value), workers
+
+    @property
+    def total(self) -> int:
+        """Samples per capture (the length ``out`` buffers for :meth:`acquire` need)."""
+        return self.ctx.total
+
+    def acquire(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Run one block capture; see :func:`acquire`."""
+        return acquire(self.ctx, out)
+
+    def save(self, adc: np.ndarray, name_stem: Optional[str] = None) -> None:
+        """Write one capture; see :func:`save`."""
+        save(self.ctx, adc, name_stem=name_stem)
+
+    def capture(self) -> np.ndarray:
+        """Acquire one block and write it out; return the raw ADC codes.
+
+        The shot is saved before the next acquire, so the driver buffer is used without a copy;
+        the returned view is overwritten by the next capture.
+        """
+        adc = self.acquire(out=self.ctx.buf_max)
+        self.save(adc)
+        return adc
+
+
+def run_capture(cfg: dict, buffer: Optional[np.ndarray] = None) -> np.ndarray:
+    """Open the unit, take and save one capture, close the unit; return the raw ADC codes.
+
+    The returned array is the driver buffer itself; pass it back as ``buffer`` to capture the
+    next shot into the same memory (it is reallocated if the sample count changed).
+    """
+    ctx = setup(cfg, buffer)
+    try:
+        # no copy: the driver buffer is not touched again once the unit is closed
+        adc = acquire(ctx, out=ctx.buf_max)
+    except BaseException:
+        teardown(ctx)
+        raise
+    # Stop/close the unit on a worker thread while this thread writes the files; the driver
+    # calls, NumPy conversion, Numba kernel and file writes all release the GIL. The write
+    # stays on the calling thread: Numba's TBB threading layer can hang interpreter exit after
+    # a parallel kernel has run on a non-main thread.
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        closed = ex.submit(teardown, ctx)
+        try:
+            save(ctx, adc, ctx.name_stem)
+        finally:
+            # a teardown error still surfaces if the save failed, chained to the save error
+            closed.result()
+    return adc
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
-# capture_multi_shot.py — run repeated captures using capture_single_shot
+# capture_multi_shot.py — run repeated captures with the shared capture engine
 # Reads settings from YAML and allows command-line overrides
 
 import argparse
+import itertools
+import os
 import sys
+import threading
 import time
-import yaml
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 
 import capture_single_shot
 
@@ -17,6 +21,11 @@ except Exception:  # pragma: no cover - msvcrt is absent on POSIX
 
 CFG_PATH = "capture_multi.yml"
 
+# Windows key watcher: one daemon thread blocks in getwch() and sets the event on a key press.
+# A watcher that outlives a rest period is reused by the next one instead of starting another.
+_KEY_EVENT = threading.Event()
+_KEY_THREAD: "threading.Thread | None" = None
+
 
 def build_argparser() -> argparse.ArgumentParser:
     """Argument parser covering multi-shot and single-shot options."""
@@ -43,36 +52,85 @@ def _wait_with_break(rest_ms: float, allow_break: bool) -> bool:
         f"Resting for {rest_ms} ms. Press any key to abort early...",
         flush=True,
     )
-    end = time.time() + rest_ms / 1000.0
-    while time.time() < end:
-        if msvcrt:
-            if msvcrt.kbhit():
-                msvcrt.getch()
-                return True
-        else:
-            dr, _, _ = select.select([sys.stdin], [], [], 0)
-            if dr:
-                sys.stdin.readline()
-                return True
-        time.sleep(0.05)
+    timeout = rest_ms / 1000.0
+    if msvcrt:
+        global _KEY_THREAD
+        # A key pressed after the last rest ended is still pending in the event: consume it
+        # here rather than clearing it when the finished watcher is replaced.
+        if _KEY_EVENT.is_set():
+            _KEY_EVENT.clear()
+            return True
+        if _KEY_THREAD is None or not _KEY_THREAD.is_alive():
+            _KEY_THREAD = threading.Thread(
+                target=lambda: (msvcrt.getwch(), _KEY_EVENT.set()), daemon=True
+            )
+            _KEY_THREAD.start()
+        if _KEY_EVENT.wait(timeout):
+            _KEY_EVENT.clear()
+            return True
+        return False
+
+    # Block until stdin has a line or the rest period ends
+    dr, _, _ = select.select([sys.stdin], [], [], timeout)
+    if dr:
+        sys.stdin.readline()
+        return True
     return False
 
 def main(cfg: dict) -> None:
+    import numpy as np
+
+    import capture  # loads the PicoSDK driver; deferred so --help stays cheap
+
     captures = int(cfg["captures"])
     rest_ms = float(cfg["rest_ms"])
     break_on_key = bool(cfg.get("break_on_key", False))
-    for i in range(captures):
-        capture_single_shot.main(cfg)
-        if i < captures - 1:
-            if _wait_with_break(rest_ms, break_on_key):
-                print("Key pressed — stopping early.")
-                break
+    # Without timestamped names every shot overwrites the same files, so keep those writes ordered
+    timestamped = bool(cfg.get("timestamp_filenames", False))
+    workers = max(1, (os.cpu_count() or 2) // 2) if timestamped else 1
+    # Open and configure the unit once; only the block capture and file writes repeat
+    with capture.PicoSession(cfg) as sess:
+        # CSV/NumPy encoding is CPU-bound and partly GIL-bound, so shots are written by worker
+        # processes while the main process re-arms the scope. At most two shots per worker are
+        # in flight; waiting on the oldest also surfaces write errors promptly.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=capture.init_writer,
+            initargs=sess.writer_args(workers),
+        ) as pool:
+            max_pending = 2 * workers
+            # A submitted array may still be waiting to be pickled to a worker until its future
+            # completes. With at most max_pending such shots, a ring of max_pending + 1 buffers
+            # always has a free slot, so shots are copied into reused buffers, not new arrays.
+            ring = itertools.cycle(
+                [np.empty(sess.total, dtype=np.int16) for _ in range(max_pending + 1)]
+            )
+            pending: deque = deque()
+            # Timestamps only resolve milliseconds, so two fast shots can share a stem; number the
+            # repeats so concurrent workers never write the same files.
+            stem_uses: Counter = Counter()
+            for i in range(captures):
+                adc = sess.acquire(out=next(ring))
+                stem = sess.name_stem
+                if timestamped:
+                    stem_uses[stem] += 1
+                    if stem_uses[stem] > 1:
+                        stem = f"{stem}_{stem_uses[stem]}"
+                pending.append(pool.submit(capture.save_in_worker, adc, stem))
+                while len(pending) > max_pending:
+                    pending.popleft().result()
+                if i < captures - 1:
+                    if _wait_with_break(rest_ms, break_on_key):
+                        print("Key pressed — stopping early.")
+                        break
+            while pending:
+                pending.popleft().result()
 
 
 if __name__ == "__main__":
     parser = build_argparser()
     args = parser.parse_args()
-    with open(args.config, "r") as f:
-        cfg = yaml.safe_load(f)
+    import _cfg
+    cfg = _cfg.load_cfg(args.config)
     cfg = capture_single_shot.apply_overrides(cfg, args)
     main(cfg)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# naming.py — output file stems for the capture scripts
+#
+# Stems are a local wall-clock timestamp, optionally followed by a compact suffix derived
+# from the latest AI/AO publication when daqio.publisher is importable in the same process.
+# If daqio/publishers are unavailable or no payload has been published yet, an info message
+# is printed and the plain timestamp is used. Pure Python: importing this module does not
+# load the PicoSDK driver.
+
+import hashlib
+import re
+import time
+from typing import Dict, Any, Tuple, Optional
+
+# ---- Optional integration with daqio.publisher (same-process latest snapshot) ----
+try:
+    from daqio.publisher import get_latest_ai as _get_latest_ai, get_latest_ao as _get_latest_ao  # type: ignore
+    _DAQIO_AVAILABLE = True
+except Exception:
+    _get_latest_ai = None  # type: ignore[assignment]
+    _get_latest_ao = None  # type: ignore[assignment]
+    _DAQIO_AVAILABLE = False
+
+# (payload, mode, max_len, suffix) of the last DAQ suffix built by name_stem(); holding the
+# payload itself keeps its identity from being reused by another object
+_LAST_SUFFIX: list = [None, None, None, ""]
+
+_SAFE = re.compile(r"[^A-Za-z0-9._-]+", re.ASCII)
+_SAFE_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._-")
+
+
+def slug(s: str) -> str:
+    """Make a string filename-safe (single path component)."""
+    s = str(s)
+    if _SAFE_CHARS.issuperset(s):  # common case ("ai0", ISO-ish stamps): no regex pass
+        return s.strip("-")
+    return _SAFE.sub("-", s).strip("-")
+
+
+def short_ch(ch: str) -> str:
+    """Shorten channel name like 'Dev1/ai0' -> 'ai0'."""
+    return ch.split("/")[-1] if "/" in ch else ch
+
+
+def fmt_val(v: float, ndigits: int = 3) -> str:
+    """Format a float compactly for filenames, e.g., -0.0123 -> 'm0p012'."""
+    s = f"{float(v):.{ndigits}f}"
+    return s.replace("-", "m").replace(".", "p")
+
+
+def build_name_suffix(
+    payload: Optional[Dict[str, Any]],
+    *,
+    mode: str = "mini",     # 'none' | 'mini' | 'full'
+    max_len: int = 120
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Turn a DAQ payload into a short, filename-safe suffix.
+    Returns (suffix, meta). If no payload, returns ("", {}).
+    """
+    if not payload or mode == "none":
+        return "", {}
+
+    # Accept either AO ('channel_values') or AI ('results') schema
+    values = payload.get("channel_values") or payload.get("results")
+    if not isinstance(values, dict):
+        # Unknown shape → safe hash
+        raw = repr(payload).encode()
+        h = hashlib.blake2b(raw, digest_size=4).hexdigest()
+        return f"DAQ_{h}", {"daq_payload": payload}
+
+    items = sorted(values.items())  # deterministic order
+    if mode == "mini":
+        items = items[:2]  # keep it short
+
+    parts = []
+    if "timestamp" in payload:
+        parts.append(slug(payload["timestamp"]))
+    parts.extend(f"{slug(short_ch(ch))}_{fmt_val(val)}" for ch, val in items)
+
+    suffix = "__".join(parts)
+    meta = {"daq_payload": payload, "daq_values": items}
+
+    # Cap length of the suffix to keep filename components safe on all platforms
+    if len(suffix) > max_len:
+        h = hashlib.blake2b(suffix.encode(), digest_size=4).hexdigest()
+        # leave some room for the hash
+        keep = max(0, max_len - (2 + len(h)))
+        suffix = f"{suffix[:keep]}__{h}"
+
+    return suffix, meta
+
+
+# (epoch minute, "Mmm-Ddd-Hhh-Mmm-") for the filename timestamp; UTC offsets are whole minutes,
+# so only the seconds/milliseconds tail changes between shots within the same minute
+_TS_MINUTE = [-1, ""]
+
+
+def timestamp() -> str:
+    """Local wall-clock stem ``Mmm-Ddd-Hhh-Mmm-Sss-U.mmm`` (milliseconds after ``U.``)."""
+    secs, rem_ns = divmod(time.time_ns(), 1_000_000_000)
+    minute = secs // 60
+    if minute != _TS_MINUTE[0]:
+        lt = time.localtime(secs)
+        _TS_MINUTE[:] = [minute, f"M{lt.tm_mon:02d}-D{lt.tm_mday:02d}-H{lt.tm_hour:02d}-M{lt.tm_min:02d}-"]
+    return f"{_TS_MINUTE[1]}S{secs % 60:02d}-U.{rem_ns // 1_000_000:03d}"
+
+
+def name_stem(daq_source: str = "auto", name_embed: str = "mini", name_max: int = 120) -> str:
+    """Build a per-shot file stem from the timestamp and optional DAQ snapshot.
+
+    ``daq_source`` is auto | ai | ao | none and ``name_embed`` is none | mini | full.
+    """
+    # ---- Build timestamp (original naming scheme) ----
+    stem = timestamp()
+
+    # ---- Optionally fold latest DAQ snapshot into the name (safe fallback) ----
+    if name_embed != "none":
+        if not _DAQIO_AVAILABLE:
+            print("[info] daqio.publisher not found; proceeding without DAQ suffix.")
+        else:
+            # choose payload based on source preference
+            payload = None
+            if daq_source in ("auto", "ai") and _get_latest_ai is not None:
+                try:
+                    payload = _get_latest_ai()
+                except Exception:
+                    payload = None
+            if payload is None and daq_source in ("auto", "ao") and _get_latest_ao is not None:
+                try:
+                    payload = _get_latest_ao()
+                except Exception:
+                    payload = None
+
+            if payload:
+                # Publishers hand out the same snapshot object until a new one is published,
+                # so repeat shots between publications reuse the previous suffix
+                last = _LAST_SUFFIX
+                if last[0] is payload and last[1] == name_embed and last[2] == name_max:
+                    suffix = last[3]
+                else:
+                    suffix, _meta = build_name_suffix(payload, mode=name_embed, max_len=name_max)
+                    last[:] = [payload, name_embed, name_max, suffix]
+                if suffix:
+                    stem = f"{stem}__{suffix}"
+            else:
+                # No recent publication available at this moment
+                print("[info] No latest DAQ payload available; proceeding without DAQ suffix.")
+
+    return stem
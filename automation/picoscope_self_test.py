@@ -4,27 +4,52 @@
 
 import ctypes
 from picosdk.ps5000a import ps5000a as ps
-from picosdk.functions import assert_pico_ok, PICO_STATUS_LOOKUP
+from picosdk.functions import assert_pico_ok
 from picosdk.constants import PICO_INFO
 
 # If you didn’t set the .pth hook earlier, uncomment:
 # import os
 # os.add_dll_directory(r"C:\Program Files\Pico Technology\SDK\lib")
 
+# Code -> name for the wrapper's status table (picosdk.constants.PICO_STATUS for ps5000a);
+# built in reverse so that, as in a forward scan, the first name listed for a code wins
+_STATUS_NAME = {v: k for k, v in reversed(list(ps.PICO_STATUS.items()))}
+
+# Input ranges in ascending code order (10 mV … 50 V) and FlexRes modes to probe
+_RANGES_SORTED = tuple(sorted(ps.PS5000A_RANGE.items(), key=lambda kv: kv[1]))
+_RESOLUTION_NAMES = ("PS5000A_DR_8BIT", "PS5000A_DR_12BIT", "PS5000A_DR_14BIT",
+                     "PS5000A_DR_15BIT", "PS5000A_DR_16BIT")
+# (label, code) for the modes this binding defines, lowest first
+_RESOLUTIONS = tuple(
+    (n.replace("PS5000A_DR_", ""), ps.PS5000A_DEVICE_RESOLUTION[n])
+    for n in _RESOLUTION_NAMES if n in ps.PS5000A_DEVICE_RESOLUTION
+)
+
+# Channels switched off by set_one_channel_A_5V (those this binding defines), resolved once
+_OTHER_CHANNELS = tuple(
+    ps.PS5000A_CHANNEL[k] for k in ("PS5000A_CHANNEL_B", "PS5000A_CHANNEL_C", "PS5000A_CHANNEL_D")
+    if k in ps.PS5000A_CHANNEL
+)
+
+# Identity strings reported by unit_info(): (field, PICO_INFO code), resolved once
+_INFO_FIELDS = tuple((field, PICO_INFO[key]) for field, key in (
+    ("model",  "PICO_VARIANT_INFO"),
+    ("serial", "PICO_BATCH_AND_SERIAL"),
+    ("driver", "PICO_DRIVER_VERSION"),
+    ("fw1",    "PICO_FIRMWARE_VERSION_1"),
+    ("fw2",    "PICO_FIRMWARE_VERSION_2"),
+    ("usb",    "PICO_USB_VERSION"),
+    ("cal",    "PICO_CAL_DATE"),
+))
+
 def status_name(code: int) -> str:
-    """Map numeric status to a readable name using this wrapper or fallback table."""
-    try:
-        for k, v in getattr(ps, "PICO_STATUS", {}).items():
-            if v == code:
-                return k
-    except Exception:
-        pass
-    return PICO_STATUS_LOOKUP.get(code, f"(unknown:{code})")
+    """Map numeric status to a readable name using this wrapper's status table."""
+    return _STATUS_NAME.get(code, f"(unknown:{code})")
 
 def dump_all_status_keys():
     print("Available PICO_STATUS keys in this wrapper:")
     try:
-        keys = sorted(getattr(ps, "PICO_STATUS", {}).keys())
+        keys = sorted(ps.PICO_STATUS.keys())
         if not keys:
             print("  (none reported by wrapper)")
             return
@@ -52,48 +77,40 @@ def unit_info(handle) -> dict:
     """Query identity strings using a proper C char buffer."""
     info = {}
     need = ctypes.c_int16()
-
-    def q(key: str) -> str:
-        buf = ctypes.create_string_buffer(256)
-        code = PICO_INFO[key]
-        st = ps.ps5000aGetUnitInfo(
-            handle, buf, ctypes.c_int16(ctypes.sizeof(buf)), ctypes.byref(need), code
-        )
-        assert_pico_ok(st)
-        return buf.value.decode(errors="ignore")
-
-    info["model"]  = q("PICO_VARIANT_INFO")
-    info["serial"] = q("PICO_BATCH_AND_SERIAL")
-    info["driver"] = q("PICO_DRIVER_VERSION")
-    info["fw1"]    = q("PICO_FIRMWARE_VERSION_1")
-    info["fw2"]    = q("PICO_FIRMWARE_VERSION_2")
-    info["usb"]    = q("PICO_USB_VERSION")
-    info["cal"]    = q("PICO_CAL_DATE")
+    # one buffer for every query: the driver NUL-terminates each string it writes
+    buf = ctypes.create_string_buffer(256)
+    buf_len = ctypes.c_int16(ctypes.sizeof(buf))
+
+    for field, code in _INFO_FIELDS:
+        st = ps.ps5000aGetUnitInfo(handle, buf, buf_len, ctypes.byref(need), code)
+        # a field the unit cannot report is shown as such instead of aborting the self-test
+        info[field] = buf.value.decode(errors="ignore") if st == 0 else f"({status_name(st)})"
     return info
 
 def list_resolutions(handle):
-    """Probe FlexRes modes the unit accepts (no assumptions)."""
-    names = ["PS5000A_DR_8BIT","PS5000A_DR_12BIT","PS5000A_DR_14BIT","PS5000A_DR_15BIT","PS5000A_DR_16BIT"]
+    """Probe FlexRes modes the unit accepts, highest first.
+
+    ps5000a resolutions nest (a unit and channel setup that accept one mode accept every lower
+    one), so the first accepted mode settles the rest: usually one SetDeviceResolution call.
+    """
     ok = []
-    for n in names:
-        code = ps.PS5000A_DEVICE_RESOLUTION.get(n)
-        if code is None:
-            continue
-        st = ps.ps5000aSetDeviceResolution(handle, code)
-        if st == 0:
-            ok.append(n.replace("PS5000A_DR_", ""))
+    for i in range(len(_RESOLUTIONS) - 1, -1, -1):
+        if ps.ps5000aSetDeviceResolution(handle, _RESOLUTIONS[i][1]) == 0:
+            ok = [label for label, _ in _RESOLUTIONS[:i + 1]]
+            break
     # restore 8-bit for timing/memory queries
     ps.ps5000aSetDeviceResolution(handle, ps.PS5000A_DEVICE_RESOLUTION["PS5000A_DR_8BIT"])
     return ok
 
 def list_ranges_A(handle):
     """List input ranges on Channel A by querying analogue offset limits."""
+    # offset limits depend on range and coupling only, so the same answer holds for every channel
     ranges = []
-    chA = ps.PS5000A_CHANNEL["PS5000A_CHANNEL_A"]
+    coupling = ps.PS5000A_COUPLING["PS5000A_DC"]
     min_off = ctypes.c_float()
     max_off = ctypes.c_float()
-    for name, code in sorted(ps.PS5000A_RANGE.items(), key=lambda kv: kv[1]):
-        st = ps.ps5000aGetAnalogueOffset(handle, chA, code, ctypes.byref(min_off), ctypes.byref(max_off))
+    for name, code in _RANGES_SORTED:
+        st = ps.ps5000aGetAnalogueOffset(handle, code, coupling, ctypes.byref(max_off), ctypes.byref(min_off))
         if st == 0:
             ranges.append(name.replace("PS5000A_", ""))  # e.g., 10MV … 50V
     return ranges
@@ -103,21 +120,38 @@ def set_one_channel_A_5V(handle):
     coupling = ps.PS5000A_COUPLING["PS5000A_DC"]
     rng = ps.PS5000A_RANGE["PS5000A_5V"]
     assert_pico_ok(ps.ps5000aSetChannel(handle, ps.PS5000A_CHANNEL["PS5000A_CHANNEL_A"], 1, coupling, rng, 0.0))
-    for key in ("PS5000A_CHANNEL_B","PS5000A_CHANNEL_C","PS5000A_CHANNEL_D"):
-        if key in ps.PS5000A_CHANNEL:
-            ps.ps5000aSetChannel(handle, ps.PS5000A_CHANNEL[key], 0, coupling, rng, 0.0)
+    for ch in _OTHER_CHANNELS:
+        ps.ps5000aSetChannel(handle, ch, 0, coupling, rng, 0.0)
+
+def fastest_dt_ns(handle, samples=1024, tb_max=10000):
+    """Find the lowest valid timebase (minimum Δt, ns) for current config.
 
-def fastest_dt_ns(handle, samples=1024):
-    """Scan timebase upward to find minimum Δt (ns) for current config."""
-    tb = 0
+    Valid timebases are monotone (once one is accepted, every larger one is too), so probe
+    0, 1, 2, 4, ... until one is accepted and then bisect the last gap: O(log tb) USB calls
+    instead of one per timebase.
+    """
     dt_ns = ctypes.c_float()
     retmax = ctypes.c_int32()
-    while tb < 10000:
+
+    def probe(tb):
         st = ps.ps5000aGetTimebase2(handle, tb, samples, ctypes.byref(dt_ns), ctypes.byref(retmax), 0)
-        if st == 0:
-            return float(dt_ns.value), tb
-        tb += 1
-    return float("nan"), -1
+        return st == 0
+
+    if probe(0):
+        return float(dt_ns.value), 0
+    lo, hi = 0, 1                       # lo: known invalid, hi: next candidate
+    while not probe(hi):
+        if hi >= tb_max - 1:
+            return float("nan"), -1
+        lo, hi = hi, min(hi * 2, tb_max - 1)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if probe(mid):
+            hi = mid
+        else:
+            lo = mid
+    probe(hi)                           # refresh dt_ns for the answer
+    return float(dt_ns.value), hi
 
 def max_samples_per_segment(handle):
     """Deep memory per segment for current config."""
@@ -137,8 +171,8 @@ def main():
         info = unit_info(handle)
         print("✅ Opened PicoScope 5000D (ps5000a). Handle:", handle.value)
         print("────────────────────────────────────")
-        for k in ("model","serial","driver","fw1","fw2","usb","cal"):
-            print(f"{k:>12}: {info.get(k,'')}")
+        for k, v in info.items():   # _INFO_FIELDS order
+            print(f"{k:>12}: {v}")
         print("────────────────────────────────────")
 
         # 3) Capabilities
@@ -1,6 +1,26 @@
 import csv
+import warnings
 from typing import Iterator
 
+import numpy as np
+
+from daq_output_runner import DaqOutputRunner
+
+# Read buffer for input files: fewer read() syscalls than the 8 KiB default on long logs
+_READ_BUFFER = 1 << 20
+
+
+def _is_header(line: str) -> bool:
+    """True if *line* is a non-empty row whose first field is not a number."""
+    field = line.split(",", 1)[0].strip()
+    if not field:
+        return False
+    try:
+        float(field)
+    except ValueError:
+        return True
+    return False
+
 
 class DaqInputRunner:
     """Simple reader for demonstration purposes.
@@ -18,13 +38,49 @@ class DaqInputRunner:
         The CSV file is expected to contain a single column of numbers.  Lines
         that cannot be parsed are skipped.
         """
-        with open(self.csv_path, newline="") as handle:
-            reader = csv.reader(handle)
-            for row in reader:
-                if not row:
-                    continue
+        yield from self.read_array().tolist()
+
+    def read_array(self) -> np.ndarray:
+        """Return the values in *csv_path* as a contiguous float64 array.
+
+        The file, less a leading header row, is parsed in C by
+        :func:`numpy.loadtxt`; a file with malformed lines falls back to
+        :py:meth:`iter_rows`, which skips them.
+        """
+        try:
+            with open(self.csv_path, newline="", buffering=_READ_BUFFER) as handle, \
+                    warnings.catch_warnings():
+                header = _is_header(handle.readline())
+                handle.seek(0)
+                warnings.simplefilter("ignore", UserWarning)  # empty input file
+                return np.loadtxt(
+                    handle, delimiter=",", usecols=(0,), dtype=np.float64,
+                    comments=None, ndmin=1, skiprows=1 if header else 0,
+                )
+        except ValueError:
+            return np.fromiter(self.iter_rows(), dtype=np.float64)
+
+    def iter_rows(self) -> Iterator[float]:
+        """Parse *csv_path* row by row, skipping lines that are not numbers."""
+        with open(self.csv_path, newline="", buffering=_READ_BUFFER) as handle:
+            firsts = (row[0] for row in csv.reader(handle) if row)
+            while True:
                 try:
-                    yield float(row[0])
+                    # map() applies float() in C across the rows; the loop
+                    # only restarts when a header or malformed value raises
+                    yield from map(float, firsts)
+                    return
                 except ValueError:
-                    # Skip any header rows or malformed values.
+                    # Skip that row: ``firsts`` resumes with the next one.
                     continue
+
+
+def run_batch(csv_path: str) -> DaqOutputRunner:
+    """Copy the values in *csv_path* to a new output runner in one assignment.
+
+    The whole column is read with :py:meth:`DaqInputRunner.read_array` and
+    recorded with a single :py:meth:`DaqOutputRunner.write_many` call.
+    """
+    output_runner = DaqOutputRunner()
+    output_runner.write_many(DaqInputRunner(csv_path).read_array())
+    return output_runner
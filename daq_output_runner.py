@@ -1,16 +1,50 @@
 from typing import List
 
+import numpy as np
+
 
 class DaqOutputRunner:
     """In-memory collector for demonstration.
 
-    The :py:meth:`write` method records values in :pyattr:`values` for later
-    inspection by tests.
+    The :py:meth:`write` and :py:meth:`write_many` methods record values in
+    :pyattr:`values` for later inspection by tests.
     """
 
-    def __init__(self):
-        self.values: List[float] = []
+    def __init__(self, capacity: int = 1024):
+        self._buf = np.empty(max(capacity, 1), dtype=np.float64)
+        self._n = 0
+
+    @property
+    def values(self) -> np.ndarray:
+        """Values recorded so far (a view of the internal buffer)."""
+        return self._buf[:self._n]
+
+    def as_list(self) -> List[float]:
+        """Values recorded so far as a list of Python floats (for legacy callers)."""
+        return self._buf[:self._n].tolist()
+
+    def _reserve(self, extra: int) -> None:
+        """Grow the buffer, doubling its size, until *extra* more values fit."""
+        need = self._n + extra
+        if need <= len(self._buf):
+            return
+        size = len(self._buf)
+        while size < need:
+            size *= 2
+        buf = np.empty(size, dtype=np.float64)
+        buf[:self._n] = self._buf[:self._n]
+        self._buf = buf
 
     def write(self, value: float) -> None:
         """Record *value* for later retrieval."""
-        self.values.append(value)
+        if self._n == len(self._buf):
+            self._reserve(1)
+        self._buf[self._n] = value
+        self._n += 1
+
+    def write_many(self, values) -> None:
+        """Record every value in *values* (any 1-D array-like) in one copy."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self._reserve(len(values))
+        self._buf[self._n:self._n + len(values)] = values
+        self._n += len(values)
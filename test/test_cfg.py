@@ -0,0 +1,72 @@
+"""
+Unit tests for the cached YAML config loader in automation/_cfg.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# the automation scripts import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "automation"))
+import _cfg  # noqa: E402
+
+
+class LoadCfgTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        # keep the on-disk cache out of the real ~/.cache and start with an empty memory cache
+        disk_cache, _cfg._CFG_DISK_CACHE = _cfg._CFG_DISK_CACHE, os.path.join(self.tmp, "cache")
+        self.addCleanup(setattr, _cfg, "_CFG_DISK_CACHE", disk_cache)
+        _cfg._CFG_CACHE.clear()
+        self.addCleanup(_cfg._CFG_CACHE.clear)
+        self.path = os.path.join(self.tmp, "capture.yml")
+
+    def write(self, text, mtime_ns=None):
+        with open(self.path, "w") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_loads_yaml_and_returns_copies(self):
+        self.write("channel: A\nsamples: 1000\ntrig: {level: 0.5}\n")
+        cfg = _cfg.load_cfg(self.path)
+        self.assertEqual(cfg, {"channel": "A", "samples": 1000, "trig": {"level": 0.5}})
+        cfg["trig"]["level"] = 9
+        self.assertEqual(_cfg.load_cfg(self.path)["trig"]["level"], 0.5)
+
+    def test_reloads_when_mtime_changes_at_same_size(self):
+        self.write("samples: 1\n", mtime_ns=1000000000)
+        self.assertEqual(_cfg.load_cfg(self.path)["samples"], 1)
+        self.write("samples: 2\n", mtime_ns=2000000000)
+        self.assertEqual(_cfg.load_cfg(self.path)["samples"], 2)
+
+    def test_reloads_when_size_changes_at_same_mtime(self):
+        self.write("samples: 1\n", mtime_ns=1000000000)
+        self.assertEqual(_cfg.load_cfg(self.path)["samples"], 1)
+        self.write("samples: 10\n", mtime_ns=1000000000)
+        self.assertEqual(_cfg.load_cfg(self.path)["samples"], 10)
+
+    def test_disk_cache_is_invalidated_across_processes(self):
+        self.write("samples: 1\n", mtime_ns=1000000000)
+        self.assertEqual(_cfg.load_cfg(self.path)["samples"], 1)
+        self.assertTrue(os.listdir(_cfg._CFG_DISK_CACHE))
+        # a fresh process starts with only the disk cache
+        _cfg._CFG_CACHE.clear()
+        self.assertEqual(_cfg.load_cfg(self.path)["samples"], 1)
+        _cfg._CFG_CACHE.clear()
+        self.write("samples: 2\n", mtime_ns=2000000000)
+        self.assertEqual(_cfg.load_cfg(self.path)["samples"], 2)
+
+    def test_unchanged_file_is_not_reparsed(self):
+        self.write("samples: 1\n")
+        _cfg.load_cfg(self.path)
+        cached = _cfg._CFG_CACHE[os.path.abspath(self.path)]
+        _cfg.load_cfg(self.path)
+        self.assertIs(_cfg._CFG_CACHE[os.path.abspath(self.path)], cached)
+
+
+if __name__ == '__main__':
+    unittest.main()
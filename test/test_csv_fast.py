@@ -0,0 +1,70 @@
+"""
+Unit tests for the CSV row renderer in automation/_csv_fast.py: its output must match the
+"%.3f,%.4f" fallback of automation/capture.py byte for byte
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# the automation scripts import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "automation"))
+import _csv_fast  # noqa: E402
+
+# Full-scale mV of every PS5000A range, and the max ADC codes seen at 8-bit and 12+-bit
+RANGES_MV = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+MAX_ADCS = (32512, 32767)
+
+# Every int16 code with Numba; a spread of them on the (slow) pure-Python kernel
+ALL_CODES = np.arange(-32768, 32768, dtype=np.int16)
+CODES = ALL_CODES if _csv_fast.NUMBA_AVAILABLE else ALL_CODES[::97]
+
+
+def render(adc, first, pre, dt_ns, range_mv, max_adc):
+    out = np.empty(len(adc) * _csv_fast.MAX_ROW_BYTES, dtype=np.uint8)
+    lengths = _csv_fast.encode_rows(adc, first, pre, dt_ns, range_mv, max_adc, out)
+    return out[:_csv_fast.pack_blocks(out, lengths)].tobytes()
+
+
+def reference(adc, first, pre, dt_ns, range_mv, max_adc):
+    # same arithmetic as the %-format path of capture._write_csv
+    time_ns = (np.arange(first, first + len(adc), dtype=np.int64) - pre) * dt_ns
+    mv = adc.astype(np.int32) * range_mv / max_adc
+    rows = np.column_stack((time_ns, mv)).ravel().tolist()
+    return (("%.3f,%.4f\n" * len(adc)) % tuple(rows)).encode("ascii")
+
+
+class EncodeRowsTest(unittest.TestCase):
+    def assertMatchesFallback(self, adc, first, pre, dt_ns, range_mv, max_adc):
+        got = render(adc, first, pre, dt_ns, range_mv, max_adc)
+        want = reference(adc, first, pre, dt_ns, range_mv, max_adc)
+        if got != want:
+            got_rows, want_rows = got.split(b"\n"), want.split(b"\n")
+            i = next(i for i, (g, w) in enumerate(zip(got_rows, want_rows)) if g != w)
+            self.fail("row %d differs: %r != %r (range %d mV, max_adc %d, dt %r)"
+                      % (i, got_rows[i], want_rows[i], range_mv, max_adc, dt_ns))
+
+    def test_every_code_every_range(self):
+        for range_mv in RANGES_MV:
+            for max_adc in MAX_ADCS:
+                self.assertMatchesFallback(CODES, 0, 0, 0.8, range_mv, max_adc)
+
+    def test_negative_times_and_offsets(self):
+        adc = CODES[:5000]
+        for dt_ns in (0.8, 1.6, 2.0, 16.0, 104.0, 3.2e3):
+            self.assertMatchesFallback(adc, 0, 4000, dt_ns, 5000, 32512)
+            self.assertMatchesFallback(adc, 123456, 200000, dt_ns, 2000, 32767)
+
+    def test_multi_block_chunk_is_packed_in_order(self):
+        n = 2 * _csv_fast.BLOCK_ROWS + 123
+        adc = np.resize(CODES, n)
+        self.assertMatchesFallback(adc, 0, n // 2, 0.8, 200, 32512)
+
+    def test_empty_chunk(self):
+        self.assertEqual(render(CODES[:0], 0, 0, 0.8, 5000, 32512), b"")
+
+
+if __name__ == '__main__':
+    unittest.main()
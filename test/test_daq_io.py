@@ -0,0 +1,70 @@
+"""
+Unit tests for the demonstration DAQ input/output runners
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from daq_input_runner import DaqInputRunner, run_batch
+from daq_output_runner import DaqOutputRunner
+
+PRESSURES_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pressures.csv")
+
+
+class TestDaqIO(unittest.TestCase):
+    def test_write_collects_read_values(self):
+        output_runner = DaqOutputRunner()
+        for value in DaqInputRunner(PRESSURES_CSV).read():
+            output_runner.write(value)
+        self.assertTrue(np.array_equal(output_runner.values, np.array([1.0, 2.0, 3.0])))
+
+    def test_run_batch_records_column(self):
+        self.assertTrue(np.array_equal(run_batch(PRESSURES_CSV).values, np.array([1.0, 2.0, 3.0])))
+
+    def test_output_runner_values_view_and_list(self):
+        output_runner = DaqOutputRunner(capacity=2)
+        for value in (1.0, 2.0, 3.0):
+            output_runner.write(value)
+        output_runner.write_many(np.array([4.0, 5.0]))
+        self.assertIsInstance(output_runner.values, np.ndarray)
+        self.assertEqual(output_runner.as_list(), [1.0, 2.0, 3.0, 4.0, 5.0])
+
+
+class TestDaqInputRunnerReadArray(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def _csv(self, text):
+        path = os.path.join(self.tmp, "values.csv")
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _read_without_fallback(self, path):
+        # iter_rows is the slow fallback; these files must be parsed by numpy.loadtxt
+        runner = DaqInputRunner(path)
+        runner.iter_rows = None
+        return runner.read_array()
+
+    def test_headerless_file_uses_loadtxt(self):
+        path = self._csv("1.5\n-2\n\n3e2,ignored\n")
+        self.assertEqual(self._read_without_fallback(path).tolist(), [1.5, -2.0, 300.0])
+
+    def test_header_row_is_skipped_by_loadtxt(self):
+        self.assertEqual(self._read_without_fallback(PRESSURES_CSV).tolist(), [1.0, 2.0, 3.0])
+
+    def test_malformed_rows_fall_back_and_are_skipped(self):
+        path = self._csv("pressure\n1\nbad\n\"2\",x\n3\n")
+        self.assertEqual(DaqInputRunner(path).read_array().tolist(), [1.0, 2.0, 3.0])
+
+    def test_empty_file(self):
+        self.assertEqual(self._read_without_fallback(self._csv("")).tolist(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
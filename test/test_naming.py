@@ -0,0 +1,59 @@
+"""
+Unit tests for the output file naming helpers in automation/naming.py
+"""
+
+import hashlib
+import os
+import sys
+import unittest
+
+# the automation scripts import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "automation"))
+import naming  # noqa: E402
+
+
+def regex_slug(s):
+    # the general path slug() takes when the string has unsafe characters
+    return naming._SAFE.sub("-", str(s)).strip("-")
+
+
+class SlugTest(unittest.TestCase):
+    def test_fast_path_matches_regex(self):
+        for s in ("ai0", "-ai0-", "2024-01-02T03.04.05", "a_b.c", "", "---", 12.5):
+            self.assertEqual(naming.slug(s), regex_slug(s), repr(s))
+
+    def test_unsafe_characters(self):
+        self.assertEqual(naming.slug("Dev1/ai 0"), "Dev1-ai-0")
+        self.assertEqual(naming.slug("2024-01-02T03:04:05+00:00"), "2024-01-02T03-04-05-00-00")
+        self.assertEqual(naming.slug("µV/ai0"), "V-ai0")
+        self.assertEqual(naming.slug("٣ai0"), "ai0")  # non-ASCII digits are not filename-safe
+
+
+class BuildNameSuffixTest(unittest.TestCase):
+    def test_no_payload(self):
+        self.assertEqual(naming.build_name_suffix(None), ("", {}))
+        self.assertEqual(naming.build_name_suffix({"results": {"ai0": 1.0}}, mode="none"), ("", {}))
+
+    def test_mini_keeps_two_sorted_channels(self):
+        payload = {"timestamp": "T1", "results": {"Dev1/ai2": 3.0, "Dev1/ai0": -0.0123, "Dev1/ai1": 2.5}}
+        suffix, meta = naming.build_name_suffix(payload)
+        self.assertEqual(suffix, "T1__ai0_m0p012__ai1_2p500")
+        self.assertEqual(meta["daq_values"], [("Dev1/ai0", -0.0123), ("Dev1/ai1", 2.5)])
+
+    def test_unknown_shape_is_hashed(self):
+        payload = {"values": [1, 2, 3]}
+        h = hashlib.blake2b(repr(payload).encode(), digest_size=4).hexdigest()
+        self.assertEqual(naming.build_name_suffix(payload)[0], "DAQ_" + h)
+
+    def test_long_suffix_is_capped_with_hash(self):
+        payload = {"channel_values": {"ao%02d" % i: i / 7 for i in range(40)}}
+        full, _ = naming.build_name_suffix(payload, mode="full", max_len=10 ** 6)
+        capped, _ = naming.build_name_suffix(payload, mode="full", max_len=60)
+        h = hashlib.blake2b(full.encode(), digest_size=4).hexdigest()
+        self.assertEqual(len(capped), 60)
+        self.assertEqual(capped, full[:60 - 2 - len(h)] + "__" + h)
+        self.assertEqual(naming.build_name_suffix(payload, mode="full", max_len=60)[0], capped)
+
+
+if __name__ == '__main__':
+    unittest.main()